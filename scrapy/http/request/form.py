@@ -5,10 +5,14 @@ This module implements the FormRequest class which is a more convenient class
 See documentation in docs/topics/request-response.rst
 """
 
+import re
+import threading
+from functools import lru_cache
+from itertools import islice
 from urllib.parse import urljoin, urlencode
 
 import lxml.html
-from parsel.selector import create_root_node
+from lxml import etree
 from w3lib.html import strip_html5_whitespace
 
 from scrapy.http.request import Request
@@ -16,6 +20,29 @@ from scrapy.utils.python import to_bytes, is_listlike
 from scrapy.utils.response import get_base_url
 
 
+# lxml parsers can be reused across documents, but not shared between threads
+_local = threading.local()
+
+_form_end_re = re.compile(rb'</form\b[^>]*>', re.IGNORECASE)
+_sentinel_tag = 'scrapy-form-sentinel'
+
+_EXSLT_NAMESPACES = {"re": "http://exslt.org/regular-expressions"}
+_inputs_xpath = etree.XPath(
+    'descendant::textarea'
+    '|descendant::select'
+    '|descendant::input[not(@type) or @type['
+    ' not(re:test(., "^(?:submit|image|reset)$", "i"))'
+    ' and (../@checked or'
+    '  not(re:test(., "^(?:checkbox|radio)$", "i")))]]',
+    namespaces=_EXSLT_NAMESPACES,
+)
+_clickables_xpath = etree.XPath(
+    'descendant::input[re:test(@type, "^(submit|image)$", "i")]'
+    '|descendant::button[not(@type) or re:test(@type, "^submit$", "i")]',
+    namespaces=_EXSLT_NAMESPACES,
+)
+
+
 class FormRequest(Request):
     valid_form_methods = ['GET', 'POST']
 
@@ -68,16 +95,94 @@ def _get_form_url(form, url):
 
 
 def _urlencode(seq, enc):
-    values = [(to_bytes(k, enc), to_bytes(v, enc))
-              for k, vs in seq
-              for v in (vs if is_listlike(vs) else [vs])]
-    return urlencode(values, doseq=1)
+    values = tuple((k, v)
+                   for k, vs in seq
+                   for v in (vs if is_listlike(vs) else [vs]))
+    if all(isinstance(k, str) and isinstance(v, str) for k, v in values):
+        if sum(len(k) + len(v) for k, v in values) <= _max_cached_formdata_length:
+            return _urlencode_str_cached(values, enc)
+        return _urlencode_str(values, enc)
+    return urlencode([(to_bytes(k, enc), to_bytes(v, enc)) for k, v in values], doseq=1)
+
+
+def _urlencode_str(values, enc):
+    # urlencode() encodes str items itself, no need to go through bytes
+    return urlencode(values, doseq=1, encoding=enc)
+
+
+# The same small formdata is often sent repeatedly, e.g. when paginating.
+# Large payloads (e.g. ASP.NET __VIEWSTATE) are rarely repeated and would
+# keep a lot of memory alive, so they are not cached
+_max_cached_formdata_length = 1024
+_urlencode_str_cached = lru_cache(maxsize=1024)(_urlencode_str)
+
+
+def _get_html_parser():
+    parser = getattr(_local, 'html_parser', None)
+    if parser is None:
+        parser = _local.html_parser = lxml.html.HTMLParser(recover=True, encoding='utf8')
+    return parser
+
+
+def _html_body(text):
+    return text.strip().replace('\x00', '').encode('utf8') or b'<html/>'
+
+
+def _create_root_node(body, base_url=None):
+    """Same as parsel.selector.create_root_node, but taking a body prepared
+    by _html_body and reusing a per-thread HTMLParser instead of creating a
+    new one for every form lookup"""
+    parser = _get_html_parser()
+    root = etree.fromstring(body, parser=parser, base_url=base_url)
+    if root is None:
+        root = etree.fromstring(b'<html/>', parser=parser, base_url=base_url)
+    return root
+
+
+def _parse_until_form(body, base_url, formnumber):
+    """Return the form at index formnumber, parsing body only up to the end
+    tag of that form.
+
+    Returns None if the form could not be located this way, in which case the
+    whole body needs to be parsed.
+    """
+    match = next(islice(_form_end_re.finditer(body), formnumber, None), None)
+    if match is None:
+        return None
+    # The sentinel tells whether the form was really closed within the
+    # prefix, and not just by reaching the end of it (e.g. because the end
+    # tag was part of a comment or a script, or forms are nested)
+    root = _create_root_node(body[:match.end()] + f'<{_sentinel_tag}>'.encode(),
+                             base_url=base_url)
+    forms = root.xpath('//form')
+    sentinels = root.xpath(f'//{_sentinel_tag}')
+    if len(forms) <= formnumber or not sentinels:
+        return None
+    form, sentinel = forms[formnumber], sentinels[-1]
+    # Anything after the sentinel means it was swallowed, and the one found
+    # comes from the page itself
+    if sentinel.xpath('boolean(node() | following::node())'):
+        return None
+    if form in sentinel.iterancestors():
+        return None
+    parent = sentinel.getparent()
+    if parent is not None:
+        parent.remove(sentinel)
+    return form
 
 
 def _get_form(response, formname, formid, formnumber, formxpath):
     """Find the form element """
-    root = create_root_node(response.text, lxml.html.HTMLParser,
-                            base_url=get_base_url(response))
+    body = _html_body(response.text)
+    base_url = get_base_url(response)
+    if (formname is None and formid is None and formxpath is None
+            and formnumber is not None and formnumber >= 0):
+        # Avoid parsing the rest of the document once the form is found
+        form = _parse_until_form(body, base_url, formnumber)
+        if form is not None:
+            return form
+
+    root = _create_root_node(body, base_url=base_url)
     forms = root.xpath('//form')
     if not forms:
         raise ValueError(f"No <form> element found in {response}")
@@ -117,23 +222,18 @@ def _get_form(response, formname, formid, formnumber, formxpath):
 
 
 def _get_inputs(form, formdata, dont_click, clickdata, response):
-    try:
-        formdata_keys = dict(formdata or ()).keys()
-    except (ValueError, TypeError):
-        raise ValueError('formdata should be a dict or iterable of tuples')
+    if isinstance(formdata, dict):
+        formdata_keys = formdata.keys()
+    else:
+        try:
+            formdata_keys = dict(formdata or ()).keys()
+        except (ValueError, TypeError):
+            raise ValueError('formdata should be a dict or iterable of tuples')
 
     if not formdata:
         formdata = ()
-    inputs = form.xpath('descendant::textarea'
-                        '|descendant::select'
-                        '|descendant::input[not(@type) or @type['
-                        ' not(re:test(., "^(?:submit|image|reset)$", "i"))'
-                        ' and (../@checked or'
-                        '  not(re:test(., "^(?:checkbox|radio)$", "i")))]]',
-                        namespaces={
-                            "re": "http://exslt.org/regular-expressions"})
     values = [(k, '' if v is None else v)
-              for k, v in (_value(e) for e in inputs)
+              for k, v in map(_value, _inputs_xpath(form))
               if k and k not in formdata_keys]
 
     if not dont_click:
@@ -151,8 +251,9 @@ def _get_inputs(form, formdata, dont_click, clickdata, response):
 def _value(ele):
     n = ele.name
     v = ele.value
-    if ele.tag == 'select':
-        return _select_value(ele, n, v)
+    handler = _value_handlers.get(ele.tag)
+    if handler is not None:
+        return handler(ele, n, v)
     return n, v
 
 
@@ -166,22 +267,29 @@ def _select_value(ele, n, v):
     elif v is not None and multiple:
         # This is a workround to bug in lxml fixed 2.3.1
         # fix https://github.com/lxml/lxml/commit/57f49eed82068a20da3db8f1b18ae00c1bab8b12#L1L1139
-        selected_options = ele.xpath('.//option[@selected]')
-        v = [(o.get('value') or o.text or '').strip() for o in selected_options]
+        v = [(o.get('value') or o.text or '').strip()
+             for o in ele.iter('option') if o.get('selected') is not None]
     return n, v
 
 
+# Tags whose (name, value) pair needs more than the element name and value
+_value_handlers = {
+    'select': _select_value,
+}
+
+
+@lru_cache(maxsize=128)
+def _clickdata_xpath(attributes):
+    return etree.XPath('.//*' + ''.join(f'[@{k}=$v{i}]' for i, k in enumerate(attributes)))
+
+
 def _get_clickable(clickdata, form):
     """
     Returns the clickable element specified in clickdata,
     if the latter is given. If not, it returns the first
     clickable element found
     """
-    clickables = list(form.xpath(
-        'descendant::input[re:test(@type, "^(submit|image)$", "i")]'
-        '|descendant::button[not(@type) or re:test(@type, "^submit$", "i")]',
-        namespaces={"re": "http://exslt.org/regular-expressions"}
-    ))
+    clickables = _clickables_xpath(form)
     if not clickables:
         return
 
@@ -203,9 +311,10 @@ def _get_clickable(clickdata, form):
             return (el.get('name'), el.get('value') or '')
 
     # We didn't find it, so now we build an XPath expression out of the other
-    # arguments, because they can be used as such
-    xpath = './/*' + ''.join(f'[@{k}="{v}"]' for k, v in clickdata.items())
-    el = form.xpath(xpath)
+    # arguments, because they can be used as such. Values are passed as XPath
+    # variables, so they need no quoting
+    xpath = _clickdata_xpath(tuple(clickdata))
+    el = xpath(form, **{f'v{i}': str(v) for i, v in enumerate(clickdata.values())})
     if len(el) == 1:
         return (el[0].get('name'), el[0].get('value') or '')
     elif len(el) > 1:
@@ -1,24 +1,26 @@
-import argparse
+import re
 import warnings
+from functools import partial
 from shlex import split
 from http.cookies import SimpleCookie
-from urllib.parse import urlparse
 
 from w3lib.http import basic_auth_header
 
+from scrapy.exceptions import ScrapyDeprecationWarning
 
-class CurlParser(argparse.ArgumentParser):
-    def error(self, message):
-        error_msg = f'There was an error parsing the curl command: {message}'
-        raise ValueError(error_msg)
 
-
-curl_parser = CurlParser()
-curl_parser.add_argument('url')
-curl_parser.add_argument('-H', '--header', dest='headers', action='append')
-curl_parser.add_argument('-X', '--request', dest='method')
-curl_parser.add_argument('-d', '--data', '--data-raw', dest='data')
-curl_parser.add_argument('-u', '--user', dest='auth')
+# Maps each supported curl option to the name of the value it sets
+_curl_options = {
+    '-H': 'headers',
+    '--header': 'headers',
+    '-X': 'method',
+    '--request': 'method',
+    '-d': 'data',
+    '--data': 'data',
+    '--data-raw': 'data',
+    '-u': 'auth',
+    '--user': 'auth',
+}
 
 
 safe_to_ignore_arguments = [
@@ -30,8 +32,102 @@ safe_to_ignore_arguments = [
     ['-#', '--progress-bar']
 ]
 
-for argument in safe_to_ignore_arguments:
-    curl_parser.add_argument(*argument, action='store_true')
+_safe_to_ignore = frozenset(arg for argument in safe_to_ignore_arguments for arg in argument)
+
+# A cookie name, optionally followed by "=" and either a quoted value, which
+# may contain ";", or a plain one
+_cookie_pair_re = re.compile(r'([^=;]*)(?:=\s*("(?:[^"\\]|\\.)*"|[^;]*))?;?')
+_cookie_decoder = SimpleCookie()
+
+_scheme_re = re.compile(r'([a-z][a-z0-9+.-]*):(//)?', re.IGNORECASE)
+# Schemes of the built-in download handlers (DOWNLOAD_HANDLERS_BASE), whose
+# URLs may not start with "scheme://", e.g. "file:/path" or "data:,text", as
+# opposed to a bare "host:port"
+_known_schemes = frozenset(['data', 'file', 'ftp', 'http', 'https', 's3'])
+
+
+def _parse_error(message):
+    return ValueError(f'There was an error parsing the curl command: {message}')
+
+
+def _option_value(option, args):
+    try:
+        return next(args)
+    except StopIteration:
+        raise _parse_error(f'argument {option}: expected one argument')
+
+
+def _parse_curl_args(curl_args):
+    """Parse the arguments of a curl command (without the leading ``curl``).
+
+    Returns a ``(parsed_args, argv)`` tuple, where ``parsed_args`` is a dict
+    with the values of the supported options and ``argv`` is the list of
+    unrecognized arguments.
+    """
+    parsed_args = {'url': None, 'headers': [], 'method': None, 'data': None, 'auth': None}
+    argv = []
+
+    def set_option(option, value):
+        dest = _curl_options[option]
+        if dest == 'headers':
+            parsed_args['headers'].append(value)
+        else:
+            parsed_args[dest] = value
+
+    args = iter(curl_args)
+    only_positionals = False
+    for arg in args:
+        if only_positionals or not arg.startswith('-') or arg == '-':
+            if parsed_args['url'] is None:
+                parsed_args['url'] = arg
+            else:
+                argv.append(arg)
+        elif arg == '--':
+            only_positionals = True
+        elif arg.startswith('--'):
+            option, eq, value = arg.partition('=')
+            if option in _curl_options:
+                set_option(option, value if eq else _option_value(option, args))
+            elif arg not in _safe_to_ignore:
+                argv.append(arg)
+        else:
+            # Short options can be grouped (-sv) and can have their value
+            # attached (-XPOST, or -X=POST as with argparse)
+            for i, char in enumerate(arg[1:], 2):
+                option = '-' + char
+                if option in _curl_options:
+                    value = arg[i:]
+                    if i == 2 and value.startswith('='):
+                        value = value[1:]
+                    set_option(option, value or _option_value(option, args))
+                    break
+                if option not in _safe_to_ignore:
+                    argv.append(arg)
+                    break
+
+    if parsed_args['url'] is None:
+        raise _parse_error('the following arguments are required: url')
+    return parsed_args, argv
+
+
+def _has_scheme(url):
+    match = _scheme_re.match(url)
+    return match is not None and (
+        match.group(2) is not None or match.group(1).lower() in _known_schemes)
+
+
+def _parse_cookies(value):
+    cookies = {}
+    for match in _cookie_pair_re.finditer(value):
+        name, val = match.group(1).strip(), match.group(2)
+        # $-prefixed names are RFC 2965 attributes ($Version, $Path, ...)
+        if val is None or not name or name.startswith('$'):
+            continue
+        val = val.strip()
+        if val.startswith('"'):
+            val = _cookie_decoder.value_decode(val)[0]
+        cookies[name] = val
+    return cookies
 
 
 def curl_to_request_kwargs(curl_command, ignore_unknown_options=True):
@@ -49,7 +145,7 @@ def curl_to_request_kwargs(curl_command, ignore_unknown_options=True):
     if curl_args[0] != 'curl':
         raise ValueError('A curl command must start with "curl"')
 
-    parsed_args, argv = curl_parser.parse_known_args(curl_args[1:])
+    parsed_args, argv = _parse_curl_args(curl_args[1:])
 
     if argv:
         msg = f'Unrecognized options: {", ".join(argv)}'
@@ -58,43 +154,126 @@ def curl_to_request_kwargs(curl_command, ignore_unknown_options=True):
         else:
             raise ValueError(msg)
 
-    url = parsed_args.url
+    url = parsed_args['url'].strip()
 
     # curl automatically prepends 'http' if the scheme is missing, but Request
     # needs the scheme to work
-    parsed_url = urlparse(url)
-    if not parsed_url.scheme:
+    if not _has_scheme(url):
         url = 'http://' + url
 
-    method = parsed_args.method or 'GET'
+    method = parsed_args['method'] or 'GET'
 
     result = {'method': method.upper(), 'url': url}
 
     headers = []
     cookies = {}
-    for header in parsed_args.headers or ():
+    for header in parsed_args['headers']:
         name, val = header.split(':', 1)
         name = name.strip()
         val = val.strip()
-        if name.title() == 'Cookie':
-            for name, morsel in SimpleCookie(val).items():
-                cookies[name] = morsel.value
+        if name.lower() == 'cookie':
+            cookies.update(_parse_cookies(val))
         else:
             headers.append((name, val))
 
-    if parsed_args.auth:
-        user, password = parsed_args.auth.split(':', 1)
+    if parsed_args['auth']:
+        user, password = parsed_args['auth'].split(':', 1)
         headers.append(('Authorization', basic_auth_header(user, password)))
 
     if headers:
         result['headers'] = headers
     if cookies:
         result['cookies'] = cookies
-    if parsed_args.data:
-        result['body'] = parsed_args.data
-        if not parsed_args.method:
+    if parsed_args['data']:
+        result['body'] = parsed_args['data']
+        if not parsed_args['method']:
             # if the "data" is specified but the "method" is not specified,
             # the default method is 'POST'
             result['method'] = 'POST'
 
     return result
+
+
+def curl_to_request_kwargs_batch(curl_commands, ignore_unknown_options=True, max_workers=None,
+                                 executor=None):
+    """Convert several cURL commands to Request kwargs in parallel.
+
+    Unless ``executor`` is given, the commands are split among a new
+    :class:`~concurrent.futures.ProcessPoolExecutor`, since parsing them is
+    CPU-bound. Warnings about unknown cURL options are emitted in the worker
+    processes.
+
+    .. note:: Starting worker processes takes longer than parsing a few
+              commands, so for small batches calling
+              :func:`curl_to_request_kwargs` in a loop is faster.
+
+    .. warning:: With the ``spawn`` start method of :mod:`multiprocessing`
+                 (the default on Windows and macOS), worker processes import
+                 the ``__main__`` module, so a script calling this function
+                 must do so under an ``if __name__ == '__main__':`` guard.
+
+    .. warning:: Do not call this function from a running crawl, e.g. from a
+                 spider callback: it blocks the Twisted reactor until all
+                 commands are converted, and forking worker processes (the
+                 ``fork`` start method, the default on Linux) from a
+                 multi-threaded process such as a crawl is unsafe.
+
+    :param curl_commands: iterable of strings containing curl commands
+    :param bool ignore_unknown_options: see :func:`curl_to_request_kwargs`
+    :param int max_workers: maximum number of worker processes (default: the
+                            number of processors of the machine). Ignored if
+                            ``executor`` is given.
+    :param executor: a :class:`concurrent.futures.Executor` to use instead of
+                     a new process pool. It is not shut down afterwards.
+    :return: list of dictionaries of Request kwargs, in the same order as
+             ``curl_commands``
+    """
+    convert = partial(curl_to_request_kwargs, ignore_unknown_options=ignore_unknown_options)
+    if executor is not None:
+        return list(executor.map(convert, curl_commands, chunksize=32))
+    # Imported here so that only users of this function pay for importing
+    # multiprocessing, as this module is imported by scrapy.http
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(convert, curl_commands, chunksize=32))
+
+
+_deprecated_curl_parser = None
+
+
+def _build_deprecated_curl_parser():
+    # The argparse-based parser that curl_to_request_kwargs() used to rely
+    # on, built on first access so that importing this module does not
+    # import argparse
+    import argparse
+
+    class CurlParser(argparse.ArgumentParser):
+        def error(self, message):
+            error_msg = f'There was an error parsing the curl command: {message}'
+            raise ValueError(error_msg)
+
+    curl_parser = CurlParser()
+    curl_parser.add_argument('url')
+    curl_parser.add_argument('-H', '--header', dest='headers', action='append')
+    curl_parser.add_argument('-X', '--request', dest='method')
+    curl_parser.add_argument('-d', '--data', '--data-raw', dest='data')
+    curl_parser.add_argument('-u', '--user', dest='auth')
+    for argument in safe_to_ignore_arguments:
+        curl_parser.add_argument(*argument, action='store_true')
+    return CurlParser, curl_parser
+
+
+def __getattr__(name):
+    if name not in ('CurlParser', 'curl_parser'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    warnings.warn(
+        f"scrapy.utils.curl.{name} is deprecated and no longer used by "
+        f"curl_to_request_kwargs(); changes to it have no effect.",
+        ScrapyDeprecationWarning,
+        stacklevel=2,
+    )
+    global _deprecated_curl_parser
+    if _deprecated_curl_parser is None:
+        _deprecated_curl_parser = _build_deprecated_curl_parser()
+    parser_class, parser = _deprecated_curl_parser
+    return parser_class if name == 'CurlParser' else parser
@@ -7,6 +7,7 @@ from unittest import mock
 from urllib.parse import parse_qs, unquote_to_bytes, urlparse
 
 from scrapy.http import Request, FormRequest, XmlRpcRequest, JsonRequest, Headers, HtmlResponse
+from scrapy.http.request.form import _html_body, _parse_until_form, _urlencode_str_cached
 from scrapy.utils.python import to_bytes, to_unicode
 
 
@@ -379,6 +380,15 @@ class FormRequestTest(RequestTest):
         r1 = self.request_class("http://www.example.com", formdata={})
         self.assertEqual(r1.body, b'')
 
+    def test_large_formdata_not_cached(self):
+        _urlencode_str_cached.cache_clear()
+        self.request_class("http://www.example.com", formdata={'page': '2'})
+        self.request_class("http://www.example.com", formdata={'page': '2'})
+        r = self.request_class("http://www.example.com", formdata={'state': 'x' * 5000})
+        self.assertEqual(r.body, b'state=' + b'x' * 5000)
+        info = _urlencode_str_cached.cache_info()
+        self.assertEqual((info.hits, info.currsize), (1, 1))
+
     def test_default_encoding_bytes(self):
         # using default encoding (utf-8)
         data = {b'one': b'two', b'price': b'\xc2\xa3 100'}
@@ -730,6 +740,18 @@ class FormRequestTest(RequestTest):
         fs = _qs(req, to_unicode=True, encoding='latin1')
         self.assertTrue(fs['price in \u00a5'])
 
+    def test_from_response_quoted_clickdata(self):
+        response = _buildresponse(
+            """<form action="get.php" method="GET">
+            <input type="submit" name="clickable" value='say "hi"'>
+            <input type="submit" name="clickable" value="say 'bye'">
+            </form>""")
+        req = self.request_class.from_response(
+            response, clickdata={'name': 'clickable', 'value': 'say "hi"'}
+        )
+        fs = _qs(req)
+        self.assertEqual(fs[b'clickable'], [b'say "hi"'])
+
     def test_from_response_multiple_forms_clickdata(self):
         response = _buildresponse(
             """<form name="form1">
@@ -823,6 +845,34 @@ class FormRequestTest(RequestTest):
         fs = _qs(req)
         self.assertEqual(fs, {b'foo': [b'xxx'], b'bar': [b'buz']})
 
+    def test_from_response_formnumber_large_document(self):
+        filler = '<p>%s</p>' % ('x' * 10000)
+        response = _buildresponse(
+            filler
+            + '<form action="first.php"><input type="hidden" name="one" value="1"></form>'
+            + filler
+            + '<form action="second.php" method="POST"><div>' + filler
+            + '<input type="hidden" name="two" value="2"></div></form>'
+            + filler + '<p id="last">')
+        req = self.request_class.from_response(response, formnumber=1)
+        self.assertEqual(req.url, 'http://example.com/second.php')
+        self.assertEqual(_qs(req), {b'two': [b'2']})
+
+        # The form is found without parsing the rest of the document
+        form = _parse_until_form(_html_body(response.text), response.url, 1)
+        self.assertIsNotNone(form)
+        self.assertEqual(form.get('action'), 'second.php')
+        self.assertEqual(form.xpath('//p[@id="last"]'), [])
+
+    def test_from_response_formnumber_end_tag_in_comment(self):
+        response = _buildresponse(
+            '<form action="first.php"><!-- </form> -->'
+            '<input type="hidden" name="one" value="1"></form>')
+        body = _html_body(response.text)
+        self.assertIsNone(_parse_until_form(body, response.url, 0))
+        req = self.request_class.from_response(response)
+        self.assertEqual(_qs(req), {b'one': [b'1']})
+
     def test_from_response_errors_formnumber(self):
         response = _buildresponse(
             """<form action="get.php" method="GET">
@@ -1,10 +1,12 @@
 import unittest
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from w3lib.http import basic_auth_header
 
 from scrapy import Request
-from scrapy.utils.curl import curl_to_request_kwargs
+from scrapy.exceptions import ScrapyDeprecationWarning
+from scrapy.utils.curl import curl_to_request_kwargs, curl_to_request_kwargs_batch
 
 
 class CurlToRequestKwargsTest(unittest.TestCase):
@@ -28,6 +30,22 @@ class CurlToRequestKwargsTest(unittest.TestCase):
         expected_result = {"method": "GET", "url": "http://www.example.org"}
         self._test_command(curl_command, expected_result)
 
+    def test_get_without_scheme_with_port(self):
+        curl_command = "curl localhost:8000/path"
+        expected_result = {"method": "GET", "url": "http://localhost:8000/path"}
+        self._test_command(curl_command, expected_result)
+
+    def test_get_scheme_without_slashes(self):
+        for url in ("file:/etc/passwd", "data:,Hello%2C%20World", "FILE:/tmp/a"):
+            with self.subTest(url=url):
+                expected_result = {"method": "GET", "url": url}
+                self.assertEqual(curl_to_request_kwargs(f"curl '{url}'"), expected_result)
+
+    def test_get_url_with_surrounding_spaces(self):
+        curl_command = "curl ' http://example.org/ '"
+        expected_result = {"method": "GET", "url": "http://example.org/"}
+        self._test_command(curl_command, expected_result)
+
     def test_get_basic_auth(self):
         curl_command = 'curl "https://api.test.com/" -u "some_username:some_password"'
         expected_result = {
@@ -86,6 +104,44 @@ class CurlToRequestKwargsTest(unittest.TestCase):
         }
         self._test_command(curl_command, expected_result)
 
+    def test_get_quoted_cookie(self):
+        curl_command = (
+            "curl http://example.org/ -H 'Cookie: a=\"b c\"; d=e'"
+        )
+        expected_result = {
+            "method": "GET",
+            "url": "http://example.org/",
+            "cookies": {"a": "b c", "d": "e"},
+        }
+        self._test_command(curl_command, expected_result)
+
+    def test_get_reserved_cookie_names(self):
+        curl_command = (
+            "curl http://example.org/ -H 'Cookie: path=/; expires=never; "
+            "domain=example.org; $Version=1; a=b'"
+        )
+        expected_result = {
+            "method": "GET",
+            "url": "http://example.org/",
+            "cookies": {"path": "/", "expires": "never", "domain": "example.org", "a": "b"},
+        }
+        self._test_command(curl_command, expected_result)
+
+    def test_get_mixed_quoted_cookies(self):
+        curl_command = (
+            "curl http://example.org/ -H 'Cookie: a=b c; path=/; sid=1; "
+            "lang=\u00e9; d=\"e;f\"; x=\"y\"'"
+        )
+        expected_result = {
+            "method": "GET",
+            "url": "http://example.org/",
+            "cookies": {
+                "a": "b c", "path": "/", "sid": "1", "lang": "\u00e9",
+                "d": "e;f", "x": "y",
+            },
+        }
+        self._test_command(curl_command, expected_result)
+
     def test_post(self):
         curl_command = (
             "curl 'http://httpbin.org/post' -X POST -H 'Cookie: _gauges_unique"
@@ -194,6 +250,56 @@ class CurlToRequestKwargsTest(unittest.TestCase):
         }
         self._test_command(curl_command, expected_result)
 
+    def test_attached_option_values(self):
+        curl_command = (
+            "curl -sXPUT 'https://www.example.org/' -d'a=b' "
+            "--header='Accept: text/html'"
+        )
+        expected_result = {
+            "method": "PUT",
+            "url": "https://www.example.org/",
+            "headers": [("Accept", "text/html")],
+            "body": "a=b",
+        }
+        self._test_command(curl_command, expected_result)
+
+    def test_thread_safety(self):
+        commands = [
+            f"curl -X PUT 'http://example.org/{i}' -H 'Cookie: n={i}' -d {i}"
+            for i in range(200)
+        ]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(curl_to_request_kwargs, commands))
+        self.assertEqual(results, [curl_to_request_kwargs(c) for c in commands])
+
+    def test_batch(self):
+        commands = [f"curl 'http://example.org/{i}' -d {i}" for i in range(100)]
+        self.assertEqual(
+            curl_to_request_kwargs_batch(commands, max_workers=2),
+            [curl_to_request_kwargs(c) for c in commands],
+        )
+
+    def test_batch_executor(self):
+        commands = [f"curl 'http://example.org/{i}'" for i in range(10)]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(
+                curl_to_request_kwargs_batch(commands, executor=executor),
+                [curl_to_request_kwargs(c) for c in commands],
+            )
+            # the executor is left usable
+            self.assertEqual(executor.submit(len, 'ab').result(), 2)
+
+    def test_batch_error(self):
+        self.assertRaisesRegex(
+            ValueError,
+            "Unrecognized options:.*--bar",
+            lambda: curl_to_request_kwargs_batch(
+                ["curl http://example.org", "curl --bar http://example.org"],
+                ignore_unknown_options=False,
+                max_workers=2,
+            ),
+        )
+
     def test_get_silent(self):
         curl_command = 'curl --silent "www.example.com"'
         expected_result = {"method": "GET", "url": "http://www.example.com"}
@@ -206,6 +312,23 @@ class CurlToRequestKwargsTest(unittest.TestCase):
             lambda: curl_to_request_kwargs("curl"),
         )
 
+    def test_short_option_equals_sign(self):
+        curl_command = "curl -X=PUT http://example.org -d=foo -H=X:y"
+        expected_result = {
+            "method": "PUT",
+            "url": "http://example.org",
+            "headers": [("X", "y")],
+            "body": "foo",
+        }
+        self._test_command(curl_command, expected_result)
+
+    def test_missing_option_value_error(self):
+        self.assertRaisesRegex(
+            ValueError,
+            r"argument -X: expected one argument",
+            lambda: curl_to_request_kwargs("curl http://example.org -X"),
+        )
+
     def test_ignore_unknown_options(self):
         # case 1: ignore_unknown_options=True:
         with warnings.catch_warnings():  # avoid warning when executing tests
@@ -229,3 +352,12 @@ class CurlToRequestKwargsTest(unittest.TestCase):
             ValueError,
             lambda: curl_to_request_kwargs("carl -X POST http://example.org")
         )
+
+    def test_deprecated_curl_parser(self):
+        import scrapy.utils.curl
+        with self.assertWarnsRegex(ScrapyDeprecationWarning, "curl_parser is deprecated"):
+            parser = scrapy.utils.curl.curl_parser
+        with self.assertWarnsRegex(ScrapyDeprecationWarning, "CurlParser is deprecated"):
+            self.assertIsInstance(parser, scrapy.utils.curl.CurlParser)
+        args, argv = parser.parse_known_args(['-X', 'POST', 'http://example.org'])
+        self.assertEqual((args.method, args.url, argv), ('POST', 'http://example.org', []))